@@ -27,32 +27,98 @@ OR OTHER DEALINGS IN THE SOFTWARE.
 
 
 import os
-from typing import Iterator
+import sys
+from operator import itemgetter
+from typing import Iterator, List, Tuple
 from urllib.parse import quote
 
 URL_BASE = "https://github.com/VaeterchenFrost/tdvisu/blob/main"
+URL_BASE_SLASH = URL_BASE + "/"
 
 AFFECTED_EXT = (
     ".py",
     ".ipynb",
 )
-
-EXCLUDED_FILENAMES = ("__init__.py",)
-
-
-def good_file_paths(top_dir: str = ".") -> Iterator[str]:
-    """Return relative path to files with extension in AFFECTED_EXT."""
-    for dir_path, dir_names, filenames in os.walk(top_dir):
-        dir_names[:] = [d for d in dir_names if d != "scripts" and d[0] not in "._"]
-        for filename in filenames:
-            if filename in EXCLUDED_FILENAMES:
-                continue
-            if os.path.splitext(filename)[1] in AFFECTED_EXT:
-                normalized_path = os.path.normpath(dir_path)
-                if normalized_path != ".":
-                    yield os.path.join(normalized_path, filename)
-                else:
-                    yield filename
+AFFECTED_EXT_SET = frozenset(AFFECTED_EXT)
+
+EXCLUDED_FILENAMES = frozenset(("__init__.py",))
+
+EXCLUDED_DIRNAMES = ("scripts",)
+
+# directory components of a path, e.g. ('tdvisu',) for 'tdvisu/reader.py'
+DirParts = Tuple[str, ...]
+
+# turns underscores into spaces for the displayed names
+UNDERSCORE_TO_SPACE = str.maketrans({"_": " "})
+
+# number of buffered lines after which the markdown gets written out
+FLUSH_LINES = 8192
+
+
+def excluded_dirname(name: str) -> bool:
+    """Whether the directory 'name' and its subtree should be skipped."""
+    return name in EXCLUDED_DIRNAMES or name[:1] in "._"
+
+
+def sorted_file_paths(top_dir: str = ".") -> Iterator[Tuple[DirParts, str]]:
+    """Return relative path to files with extension in AFFECTED_EXT in sorted order.
+
+    Entries of every directory get sorted and visited depth first, so the paths
+    come out in the same order as sorting all of them, without collecting them.
+    Every path comes with the directory components leading to it.
+    """
+    top = os.path.normpath(top_dir)
+    top_parts = tuple(top.rstrip(os.sep).split(os.sep)) if top != os.curdir else ()
+    # pop() takes the last item, so entries are pushed in reverse sorted order
+    stack = [(top, True, top_parts)]
+    while stack:
+        path, is_dir, parts = stack.pop()
+        if not is_dir:
+            yield parts, path
+            continue
+        try:
+            scandir_it = os.scandir(path)
+        except OSError:  # skip unreadable directories like os.walk
+            continue
+        # children are concatenated onto this prefix, leaving out a leading '.'
+        if path == os.curdir:
+            prefix = ""
+        elif path.endswith(os.sep):
+            prefix = path
+        else:
+            prefix = path + os.sep
+        children = []
+        with scandir_it as entries:
+            for entry in entries:
+                name = entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    # prune before descending so excluded subtrees are never scanned
+                    if excluded_dirname(name):
+                        continue
+                    # the paths below compare like 'name' followed by the separator
+                    child = (name + os.sep, prefix + name, True, parts + (name,))
+                    children.append(child)
+                    continue
+                # ordered by how many files each check usually rejects, a name
+                # without '.' slices to its last character which never matches
+                if name[name.rfind(".") :] not in AFFECTED_EXT_SET:
+                    continue
+                if name in EXCLUDED_FILENAMES:
+                    continue
+                if not entry.is_file():
+                    continue
+                children.append((name, prefix + name, False, parts))
+        children.sort(key=itemgetter(0), reverse=True)
+        stack.extend(child[1:] for child in children)
+
+
+def good_file_paths(top_dir: str = ".") -> Iterator[Tuple[DirParts, str]]:
+    """Return sorted relative paths to files with extension in AFFECTED_EXT.
+
+    Each path is paired with the components of its directory, so the nesting
+    depth is known without splitting the path again.
+    """
+    return sorted_file_paths(top_dir)
 
 
 def md_prefix(nesting) -> str:
@@ -60,29 +126,54 @@ def md_prefix(nesting) -> str:
     return f"{nesting * '  '}*" if nesting else "\n##"
 
 
-def print_path(old_path: str, new_path: str) -> str:
-    """Print one header line in the markdown."""
-    old_parts = old_path.split(os.sep)
-    for i, new_part in enumerate(new_path.split(os.sep)):
-        if i + 1 > len(old_parts) or old_parts[i] != new_part:
-            if new_part:
-                print(f"{md_prefix(i)} {new_part.replace('_', ' ').title()}")
-    return new_path
+# prefixes for the usual nesting levels, looked up instead of calling md_prefix
+MD_PREFIXES = tuple(md_prefix(nesting) for nesting in range(64))
+
+
+def md_prefix_cached(nesting: int) -> str:
+    """The prefix from MD_PREFIXES, built for levels nested deeper."""
+    return MD_PREFIXES[nesting] if nesting < len(MD_PREFIXES) else md_prefix(nesting)
+
+
+def path_headers(old_parts: DirParts, new_parts: DirParts) -> List[str]:
+    """Return the header lines in the markdown for changing into new_parts."""
+    common = 0
+    for old_part, new_part in zip(old_parts, new_parts):
+        if old_part != new_part:
+            break
+        common += 1
+    return [
+        f"{md_prefix_cached(i)} {new_part.translate(UNDERSCORE_TO_SPACE).title()}\n"
+        for i, new_part in enumerate(new_parts[common:], common)
+        if new_part
+    ]
 
 
 def print_directory_md(top_dir: str = ".") -> None:
     """Print the markdown for files with selected extensions recursing top_dir."""
-    old_path = ""
-    for filepath in sorted(good_file_paths(top_dir)):
-        filepath, filename = os.path.split(filepath)
-        if filepath != old_path:
-            old_path = print_path(old_path, filepath)
-        indent = (filepath.count(os.sep) + 1) if filepath else 0
-        url = "/".join(
-            (URL_BASE, *[quote(part) for part in (filepath, filename) if part])
-        )
-        filename = os.path.splitext(filename.replace("_", " ").title())[0]
-        print(f"{md_prefix(indent)} [{filename}]({url})")
+    # local aliases spare the global and attribute lookups inside the loop
+    write, sep, quote_part = sys.stdout.write, os.sep, quote
+    prefixes, num_prefixes = MD_PREFIXES, len(MD_PREFIXES)
+    buf: List[str] = []
+    append = buf.append
+    old_parts: DirParts = ()
+    for dir_parts, filepath in good_file_paths(top_dir):
+        if dir_parts != old_parts:
+            buf.extend(path_headers(old_parts, dir_parts))
+            old_parts = dir_parts
+        dirpath, has_dir, filename = filepath.rpartition(sep)
+        indent = len(dir_parts)
+        if has_dir:
+            url = f"{URL_BASE_SLASH}{quote_part(dirpath)}/{quote_part(filename)}"
+        else:
+            url = f"{URL_BASE_SLASH}{quote_part(filename)}"
+        name = filename.rsplit(".", 1)[0].translate(UNDERSCORE_TO_SPACE).title()
+        prefix = prefixes[indent] if indent < num_prefixes else md_prefix(indent)
+        append(f"{prefix} [{name}]({url})\n")
+        if len(buf) >= FLUSH_LINES:
+            write("".join(buf))
+            buf.clear()
+    write("".join(buf))
 
 
 if __name__ == "__main__":
@@ -26,20 +26,31 @@ Copyright (C) 2020-2024 Martin Röbke
 
 import abc
 import argparse
+import atexit
 import json
 import logging
+import os
 import sys
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import add
 from pathlib import Path
-from time import sleep
-from typing import List, Optional, Tuple
+from time import monotonic, sleep
+from typing import Callable, Iterator, List, Optional, Tuple
 
 import psycopg as pg
 from psycopg import sql
+from psycopg_pool import ConnectionPool
+
+try:  # optional faster serialization of the result
+    import orjson
+except ImportError:
+    orjson = None
 
-from tdvisu.dijkstra import bidirectional_dijkstra as find_path
 from tdvisu.reader import TwReader
-from tdvisu.utilities import convert_to_adj, flatten, get_parser
+from tdvisu.utilities import convert_to_csr, get_parser
+from tdvisu.utilities import tree_parents, tree_path
 from tdvisu.utilities import logging_cfg, read_yml_or_cfg
 
 LOGGER = logging.getLogger('construct_dpdb_visu.py')
@@ -52,8 +63,17 @@ DEFAULT_DBCONFIG = {
     "application_name": "dpdb-admin"
 }
 
-def read_cfg(cfg_file, section: str, prefer_cfg: bool = False) -> dict:
-    """Read the config file and return the result of one section."""
+# seconds to wait for a connection to become usable
+CONNECTION_TIMEOUT = 5.0
+
+# shared by all create_json calls, see get_pool
+_POOL: Optional[ConnectionPool] = None
+
+
+@lru_cache(maxsize=32)
+def _read_cfg_cached(cfg_file, section: str, prefer_cfg: bool,
+                     mtime: Optional[float]) -> dict:
+    """Read one section, cached for as long as the file is not modified."""
     try:
         file_content = read_yml_or_cfg(cfg_file, prefer_cfg=prefer_cfg)
         content = dict(file_content[section])
@@ -66,6 +86,16 @@ def read_cfg(cfg_file, section: str, prefer_cfg: bool = False) -> dict:
     return content
 
 
+def read_cfg(cfg_file, section: str, prefer_cfg: bool = False) -> dict:
+    """Read the config file and return the result of one section."""
+    try:
+        mtime = os.stat(cfg_file).st_mtime
+    except (OSError, TypeError):
+        mtime = None
+    # copy, so that callers can not change the cached result
+    return dict(_read_cfg_cached(cfg_file, section, prefer_cfg, mtime))
+
+
 def db_config(filename: str = 'database.ini',
               section: str = 'postgresql') -> dict:
     """Return the database config as JSON"""
@@ -75,62 +105,67 @@ def db_config(filename: str = 'database.ini',
     return {**DEFAULT_DBCONFIG, **cfg}
 
 
-def query_problem(cursor, problem: int) -> str:  # pragma: no cover
-    """Query type from public.problem for one problem."""
-    cursor.execute("SELECT type FROM "
-                   "public.problem WHERE id=%s", (int(problem),))
-    result = cursor.fetchone()[0]
+def problem_table(problem: int, name: str) -> sql.Identifier:
+    """Identifier of the table 'name' belonging to the problem.
+
+    Quoted as one identifier the statements for a problem keep the same text,
+    so the prepared statements can be reused on the pooled connections.
+    """
+    return sql.Identifier("public", f"p{int(problem)}_{name}")
+
+
+def query_problem(cursor, problem: int) -> Tuple[str, int]:  # pragma: no cover
+    """Query type and num_vertices from public.problem for one problem."""
+    cursor.execute("SELECT type,num_vertices FROM "
+                   "public.problem WHERE id=%s", (int(problem),), prepare=True)
+    result = cursor.fetchone()
     return result
 
 
 def query_num_vars(cursor, problem: int) -> int:  # pragma: no cover
     """Query num_vertices from public.problem for one problem."""
     cursor.execute(
-        "SELECT num_vertices FROM public.problem WHERE id=%s", (int(problem),))
+        "SELECT num_vertices FROM public.problem WHERE id=%s", (int(problem),),
+        prepare=True)
     result = cursor.fetchone()[0]
     return result
 
 
-def query_sat_clause(cursor, problem: int) -> List[Tuple[Optional[bool]]]:  # pragma: no cover
-    """Query sat-clauses for one problem."""
-    try:
-        cursor.execute(
-            sql.SQL("SELECT * FROM public.p{}_sat_clause").format(sql.Literal(int(problem))))
-    except pg.ProgrammingError:
-        LOGGER.error(
-            "dpdb.py *SAT needs to be run with '--store-formula'!")
-        raise
-    result = cursor.fetchall()
-    return result
-
-
-def query_td_bag_grouped(cursor, problem: int) -> List[List[int]]:  # pragma: no cover
-    """Query bag-ids for one problem."""
-    cursor.execute(
-        sql.SQL("SELECT bag FROM public.p{}_td_bag GROUP BY bag").format(
-            sql.Literal(int(problem))))
-    result = cursor.fetchall()
-    return result
+def query_sat_clause(connection, problem: int) -> Iterator[
+        Tuple[Optional[bool], ...]]:  # pragma: no cover
+    """Stream the sat-clauses for one problem through a server-side cursor."""
+    with connection.cursor(name='clause_stream') as cur:
+        cur.itersize = 2000
+        try:
+            cur.execute(
+                sql.SQL("SELECT * FROM {}").format(problem_table(problem, "sat_clause")))
+        except pg.ProgrammingError:
+            LOGGER.error(
+                "dpdb.py *SAT needs to be run with '--store-formula'!")
+            raise
+        yield from cur
 
 
 def query_td_node_status(
-        cursor, problem: int, bag: int) -> Tuple[datetime, timedelta]:  # pragma: no cover
-    """Query details about the status of one node.
-    Currently start_time and end_time-start_time."""
+        cursor, problem: int) -> List[Tuple[int, datetime, timedelta]]:  # pragma: no cover
+    """Query details about the status of all nodes.
+    Currently node, start_time and end_time-start_time."""
     cursor.execute(
         sql.SQL(
-            "SELECT start_time,end_time-start_time "
-            "FROM public.p{}_td_node_status WHERE node=%s").format(
-            sql.Literal(int(problem))), (int(bag),))
-    result = cursor.fetchone()
+            "SELECT node,start_time,end_time-start_time "
+            "FROM {}").format(problem_table(problem, "td_node_status")),
+        prepare=True)
+    result = cursor.fetchall()
     return result
 
 
-def query_td_bag(cursor, problem: int, bag: int) -> List[Tuple[int]]:  # pragma: no cover
-    """Query nodes included in one bag."""
+def query_td_bag(cursor, problem: int) -> List[Tuple[int, List[int]]]:  # pragma: no cover
+    """Query all bags with their sorted nodes ordered by bag."""
     cursor.execute(
-        sql.SQL("SELECT node FROM public.p{}_td_bag WHERE bag=%s").format(
-            sql.Literal(int(problem))), (int(bag),))
+        sql.SQL("SELECT bag,array_agg(node ORDER BY node) FROM {} "
+                "GROUP BY bag ORDER BY bag").format(
+            problem_table(problem, "td_bag")),
+        prepare=True)
     result = cursor.fetchall()
     return result
 
@@ -138,37 +173,39 @@ def query_td_bag(cursor, problem: int, bag: int) -> List[Tuple[int]]:  # pragma:
 def query_td_node_status_ordered(cursor, problem: int) -> List[Tuple[int]]:  # pragma: no cover
     """Query bags ordered by 'start_time'."""
     cursor.execute(
-        sql.SQL("SELECT node FROM public.p{}_td_node_status ORDER BY start_time").format(
-            sql.Literal(int(problem))))
+        sql.SQL("SELECT node FROM {} ORDER BY start_time").format(
+            problem_table(problem, "td_node_status")),
+        prepare=True)
     result = cursor.fetchall()
     return result
 
 
-def query_column_name(cursor, problem: int, bag: int) -> List[Tuple[str]]:  # pragma: no cover
-    """Query column names for one bag."""
-    cursor.execute(
-        sql.SQL(
-            "SELECT column_name FROM INFORMATION_SCHEMA.COLUMNS "
-            "WHERE TABLE_NAME = 'p{}_td_node_{}'").format(
-            sql.Literal(int(problem)),
-            sql.Literal(int(bag))))
-    result = cursor.fetchall()
-    return result
-
+def query_bags(connection, problem: int, bags: List[int]) -> Iterator[
+        Tuple[int, List[str], List[Tuple[Optional[bool], ...]]]]:  # pragma: no cover
+    """Query solution data for several bags.
 
-def query_bag(cursor, problem: int, bag: int) -> List[Tuple[Optional[bool]]]:  # pragma: no cover
-    """Query solution data for one bag."""
-    cursor.execute(sql.SQL(
-        "SELECT * FROM public.p{}_td_node_{}").format(sql.Literal(int(problem)), sql.Literal(int(bag))))
-    result = cursor.fetchall()
-    return result
+    All queries are sent in one pipeline before the first result is read,
+    instead of waiting for a round-trip per query.
+    Every bag comes with the column names of its table.
+    """
+    with connection.pipeline():
+        cursors = []
+        for bag in bags:
+            cur = connection.cursor()
+            cur.execute(sql.SQL("SELECT * FROM {}").format(
+                problem_table(problem, f"td_node_{int(bag)}")))
+            cursors.append(cur)
+        for bag, cur in zip(bags, cursors):
+            with cur:
+                rows = cur.fetchall()
+                yield bag, [column.name for column in cur.description], rows
 
 
 def query_edgearray(cursor, problem: int) -> List[Tuple[int, int]]:  # pragma: no cover
     """Query edges between bags for one problem."""
     cursor.execute(
-        sql.SQL("SELECT node,parent FROM public.p{}_td_edge").format(
-            sql.Literal(int(problem))))
+        sql.SQL("SELECT node,parent FROM {}").format(problem_table(problem, "td_edge")),
+        prepare=True)
     result = cursor.fetchall()
     return result
 
@@ -179,35 +216,23 @@ class IDpdbVisuConstruct(metaclass=abc.ABCMeta):
     on the tree decomposition.
     See details for i-face impl in https://realpython.com/python-interface/
     """
-    @classmethod
-    def __subclasshook__(cls, subclass):
-        return (hasattr(subclass, 'construct') and
-                callable(subclass.construct) and
-                hasattr(subclass, 'read_labeldict') and
-                callable(subclass.read_labeldict) and
-                hasattr(subclass, 'read_timeline') and
-                callable(subclass.read_timeline) and
-                hasattr(subclass, 'read_edgearray') and
-                callable(subclass.read_edgearray) or
-                NotImplemented)
-
     @abc.abstractmethod
     def construct(self) -> dict:
         """Return the constructed Json."""
         raise NotImplementedError   # pragma: no cover
 
     @abc.abstractmethod
-    def read_edgearray(self) -> list:
+    def read_edgearray(self, cur=None) -> list:
         """Return the edges between the bags."""
         raise NotImplementedError   # pragma: no cover
 
     @abc.abstractmethod
-    def read_labeldict(self) -> list:
+    def read_labeldict(self, cur=None) -> list:
         """Construct the corresponding labels for each bag."""
         raise NotImplementedError   # pragma: no cover
 
     @abc.abstractmethod
-    def read_timeline(self, edgearray) -> list:
+    def read_timeline(self, edgearray, cur=None) -> list:
         """Read from td_node_status and the edearray to
             - create the timeline of the solving process
             - construct the path and solution-tables used during solving.
@@ -218,32 +243,52 @@ class IDpdbVisuConstruct(metaclass=abc.ABCMeta):
 class DpdbSharpSatVisu(IDpdbVisuConstruct):
     """Implementation of the JSON-construction for the SharpSat problem."""
 
-    def __init__(self, db: pg.Connection, problem: int, intermed_nodes: bool):
+    # combines the last values of the solution rows into the footer's total
+    aggregate: Optional[Callable[[int, int], int]] = staticmethod(add)
+
+    def __init__(self, db: pg.Connection, problem: int, intermed_nodes: bool,
+                 num_vars: Optional[int] = None):
         """db : psycopg.connection
             database to read from.
         problem : int
             index of the problem.
         intermed_nodes : bool
             if True calculates the shortest path between successive nodes.
+        num_vars : int, optional
+            number of vertices if already known, otherwise read on demand.
         """
         LOGGER.debug("Creating %s for problem %d.",
                      self.__class__.__name__, problem)
         self.problem = problem
         self.intermed_nodes = intermed_nodes
-        self.num_vars = None
+        self.num_vars = num_vars
 
-        # wait for good connection
+        # wait for good connection, connections from the pool already are
         sleeptimer = 0.5
+        deadline = monotonic() + CONNECTION_TIMEOUT
         while (status:=db.info.status) != pg.pq.ConnStatus.OK:
+            if monotonic() >= deadline:
+                raise pg.OperationalError(
+                    f"DB connection still in status {status.name} "
+                    f"after {CONNECTION_TIMEOUT}s")
             logging.warning(
                 "Waiting %.2fs for DB connection in status %s",
                 sleeptimer,
-                status._name_,
+                status.name,
             )
             sleep(sleeptimer)
 
         self.connection = db
 
+    @contextmanager
+    def cursor(self, cur=None) -> Iterator[pg.Cursor]:
+        """Use the cursor 'cur', or a new one closed afterwards if None."""
+        if cur is not None:
+            yield cur
+        else:
+            with self.connection.cursor() as new_cur:
+                yield new_cur
+
     def construct(self) -> dict:
         """
         Construct the Json calling several helper methods.
@@ -254,30 +299,31 @@ class DpdbSharpSatVisu(IDpdbVisuConstruct):
             The Json for the visualization-API.
 
         """
-
-        clauses_edges = self.read_clauses()
-        incidence_graph = {
-            "var_name_one": 'c_',
-            "var_name_two": 'v_',
-            "infer_primal": True,
-            "edges": clauses_edges}
-
-        # create tree_dec_json
-        labeldict = self.read_labeldict()
-        edgearray = self.read_edgearray()
-        tree_dec_json = {
-            "bagpre": "bag %s",
-            "edgearray": edgearray,
-            "labeldict": labeldict,
-            "num_vars": self.read_num_vars()}
-
-        timeline = self.read_timeline(edgearray)
+        # one cursor shared by all steps
+        with self.connection.cursor() as cur:
+            clauses_edges = self.read_clauses()
+            incidence_graph = {
+                "var_name_one": 'c_',
+                "var_name_two": 'v_',
+                "infer_primal": True,
+                "edges": clauses_edges}
+
+            # create tree_dec_json
+            labeldict = self.read_labeldict(cur)
+            edgearray = self.read_edgearray(cur)
+            tree_dec_json = {
+                "bagpre": "bag %s",
+                "edgearray": edgearray,
+                "labeldict": labeldict,
+                "num_vars": self.read_num_vars(cur)}
+
+            timeline = self.read_timeline(edgearray, cur)
 
         return {'incidenceGraph': incidence_graph,
                 'tdTimeline': timeline,
                 'treeDecJson': tree_dec_json}
 
-    def read_num_vars(self) -> int:
+    def read_num_vars(self, cur=None) -> int:
         """
         Select the number of vertices in the graph.
 
@@ -287,10 +333,11 @@ class DpdbSharpSatVisu(IDpdbVisuConstruct):
             Number of vertices in the graph.
 
         """
-        with self.connection.cursor() as cur:  # create a cursor
-            self.num_vars = query_num_vars(cur, self.problem)
-            assert isinstance(self.num_vars, int)
-            return self.num_vars
+        if self.num_vars is None:
+            with self.cursor(cur) as cur:
+                self.num_vars = query_num_vars(cur, self.problem)
+        assert isinstance(self.num_vars, int)
+        return self.num_vars
 
     def read_clauses(self) -> list:
         """Return the clauses used for satisfiability.
@@ -302,16 +349,16 @@ class DpdbSharpSatVisu(IDpdbVisuConstruct):
                 "list" : [ 1, -4, 6 ]
             },...]
         """
-        with self.connection.cursor() as cur:
-            result = query_sat_clause(cur, self.problem)
-            result_cleaned = [[pos if elem else -pos for pos, elem in
-                               enumerate(line, 1) if elem is not None]
-                              for line in result]
-            clauses_edges = [{'id': i, 'list': item}
-                             for (i, item) in enumerate(result_cleaned, 1)]
-            return clauses_edges
-
-    def read_labeldict(self) -> list:
+        # zip stops at the end of each row, so one range numbers all of them
+        positions = range(1, sys.maxsize)
+        clauses_edges = [
+            {'id': i, 'list': [pos if elem else -pos for pos, elem in
+                               zip(positions, line) if elem is not None]}
+            for i, line in enumerate(
+                query_sat_clause(self.connection, self.problem), 1)]
+        return clauses_edges
+
+    def read_labeldict(self, cur=None) -> list:
         """
         Read edges from '_td_bag' and the labels from 'td_node_status' for the bags.
 
@@ -321,20 +368,15 @@ class DpdbSharpSatVisu(IDpdbVisuConstruct):
             The filled labeldict for visualization.
 
         """
-        with self.connection.cursor() as cur:  # create a cursor
+        with self.cursor(cur) as cur:
+            # two queries for all bags instead of two for every bag
+            nodes_by_bag = query_td_bag(cur, self.problem)
+            LOGGER.debug("bags: %s", [bag for bag, _ in nodes_by_bag])
+            status = {node: (start_time, dtime) for node, start_time, dtime
+                      in query_td_node_status(cur, self.problem)}
             labeldict = []
-            # check bag numbering:
-            bags = sorted(
-                list(
-                    flatten(
-                        query_td_bag_grouped(
-                            cur,
-                            self.problem))))
-            LOGGER.debug("bags: %s", bags)
-            for bag in bags:
-                nodes = list(flatten(query_td_bag(cur, self.problem, bag)))
-                start_time, dtime = query_td_node_status(
-                    cur, self.problem, bag)
+            for bag, nodes in nodes_by_bag:
+                start_time, dtime = status[bag]
                 labeldict.append(
                     {'id': bag, 'items': nodes, 'labels':
                      [str(nodes),
@@ -343,7 +385,7 @@ class DpdbSharpSatVisu(IDpdbVisuConstruct):
                       ]})
             return labeldict
 
-    def read_timeline(self, edgearray) -> list:
+    def read_timeline(self, edgearray, cur=None) -> list:
         """
         Read from td_node_status and the edearray to
         - create the timeline of the solving process
@@ -355,6 +397,8 @@ class DpdbSharpSatVisu(IDpdbVisuConstruct):
             Representing the tree-like structure between all bag-ids.
             It is assumed that all ids are included in this array.
             Example: [(2, 1), (3, 2), (4, 2), (5, 4)]
+        cur : psycopg.Cursor, optional
+            Cursor to query with, by default a new one.
 
         Returns
         -------
@@ -362,80 +406,84 @@ class DpdbSharpSatVisu(IDpdbVisuConstruct):
             array of bagids and eventually solution-tables.
 
         """
-        with self.connection.cursor() as cur:  # create a cursor
+        with self.cursor(cur) as cur:
             timeline = list()
-            adj = convert_to_adj(edgearray) if self.intermed_nodes else {}
-            order_solved = list(
-                flatten(
-                    query_td_node_status_ordered(
-                        cur, self.problem)))
+            order_solved = [row[0] for row in
+                            query_td_node_status_ordered(cur, self.problem)]
             # tour sol -> through result nodes along the edges
 
             if self.intermed_nodes:
                 last = order_solved[-1]
-                startpath = find_path(adj, last, order_solved[0])
-                timeline = [[bag] for bag in startpath[1]]
+                # paths in the tree are unique, search it once from the root
+                parent, depth = tree_parents(convert_to_csr(edgearray), last)
+                startpath = tree_path(parent, depth, last, order_solved[0])
+                timeline = [[bag] for bag in startpath]
             else:
                 timeline.append([order_solved[0]])
             # add the other bags in order_solved to the timeline
             last = order_solved[0]
-            for bag in order_solved:
+            aggregate = self.aggregate
+            bag_tables = query_bags(
+                self.connection, self.problem, order_solved)
+            for bag, column_names, solution_raw in bag_tables:
                 if self.intermed_nodes:
-                    path = find_path(adj, last, bag)
-                    for intermed in path[1][1:]:
+                    path = tree_path(parent, depth, last, bag)
+                    for intermed in path[1:]:
                         timeline.append([intermed])
-                # query column names
-                column_names = list(
-                    flatten(
-                        query_column_name(
-                            cur,
-                            self.problem,
-                            bag)))
                 LOGGER.debug("column_names %s", column_names)
-                # get solutions
-                solution_raw = query_bag(cur, self.problem, bag)
                 LOGGER.debug("solution_raw %s", solution_raw)
                 # check for nulled variables - assuming whole columns are
                 # nulled:
                 columns_notnull = [column_names[i] for i, x in
                                    enumerate(solution_raw[0]) if x is not None]
+                lines = []
+                total = None
+                for row in solution_raw:
+                    line = [int(v) for v in row if v is not None]
+                    lines.append(line)
+                    if aggregate is not None:
+                        # fold the footer in the same pass
+                        total = (line[-1] if total is None
+                                 else aggregate(total, line[-1]))
                 solution = [bag,
-                            [[columns_notnull,
-                              *[[int(v) for v in row if v is not None]
-                                for row in solution_raw]],
+                            [[columns_notnull, *lines],
                              "sol bag " + str(bag),
-                             self.footer(solution_raw),
+                             self.footer(total),
                              True]]
                 timeline.append(solution)
                 last = bag
             return timeline
 
-    def read_edgearray(self):
+    def read_edgearray(self, cur=None):
         """Read from _td_edge the edges between bags."""
-        with self.connection.cursor() as cur:
+        with self.cursor(cur) as cur:
             return query_edgearray(cur, self.problem)
 
     @staticmethod
-    def footer(lines) -> str:
+    def footer(total) -> str:
         """Returns the footer for solution bags."""
-        return "sum: " + str(sum([li[-1] for li in lines]))
+        return "sum: " + str(total)
 
 
 class DpdbSatVisu(DpdbSharpSatVisu):
     """Implementation of the JSON-construction for the SAT problem.
     Removing the solution sum in bottom-label.
     """
+    aggregate = None
+
     @staticmethod
-    def footer(lines) -> str:
+    def footer(total) -> str:
         """Returns empty footer."""
         return ""
 
 
 class DpdbMinVcVisu(DpdbSharpSatVisu):
     """Implementation of the JSON-construction for the MinVC problem."""
+    aggregate = staticmethod(min)
 
-    def __init__(self, db, problem, intermed_nodes, tw_file=None):
-        super().__init__(db, problem, intermed_nodes)
+    def __init__(self, db, problem, intermed_nodes, tw_file=None,
+                 num_vars=None):
+        super().__init__(db, problem, intermed_nodes, num_vars)
         self.tw_file = tw_file
 
     def read_clauses(self):
@@ -444,9 +492,9 @@ class DpdbMinVcVisu(DpdbSharpSatVisu):
             " can not read_clauses!")
 
     @staticmethod
-    def footer(lines) -> str:
+    def footer(total) -> str:
         """Returns the footer for solution bags."""
-        return "min-size: " + str(min([li[-1] for li in lines]))
+        return "min-size: " + str(total)
 
     def read_twfile(self) -> list:
         """
@@ -478,43 +526,55 @@ class DpdbMinVcVisu(DpdbSharpSatVisu):
             The Json for the visualization-API.
 
         """
-        # create tree_dec_json
-        labeldict = self.read_labeldict()
-        edgearray = self.read_edgearray()
-        tree_dec_json = {
-            'bagpre': "bag %s",
-            'edgearray': edgearray,
-            'labeldict': labeldict,
-            'num_vars': self.read_num_vars()}
-
-        general_gr = {'edges': self.read_twfile()} if self.tw_file else False
-
-        timeline = self.read_timeline(edgearray)
+        # one cursor shared by all steps
+        with self.connection.cursor() as cur:
+            # create tree_dec_json
+            labeldict = self.read_labeldict(cur)
+            edgearray = self.read_edgearray(cur)
+            tree_dec_json = {
+                'bagpre': "bag %s",
+                'edgearray': edgearray,
+                'labeldict': labeldict,
+                'num_vars': self.read_num_vars(cur)}
+
+            general_gr = {'edges': self.read_twfile()} if self.tw_file else False
+
+            timeline = self.read_timeline(edgearray, cur)
         return {'generalGraph': general_gr,
                 'tdTimeline': timeline,
                 'treeDecJson': tree_dec_json}
 
 
-def connect():
-    """Connect to the PostgreSQL database server using the params from config."""
+def _log_version(conn) -> None:
+    """Log the server version for every new connection of the pool."""
+    # reported by libpq on connecting, no need for 'SELECT version()'
+    LOGGER.info("PostgreSQL database version: %s", conn.info.server_version)
 
-    conn = None
-    try:
+
+def get_pool() -> ConnectionPool:
+    """Return the connection pool, opened on the first call."""
+    global _POOL  # pylint: disable=global-statement
+    if _POOL is None:
         # read connection parameters
         params = db_config(filename="database.ini")
-        db_name = params["database"]
-        LOGGER.info("Connecting to the PostgreSQL database '%s'...", db_name)
-        conn = pg.connect(**params)
-        with conn.cursor() as cur:  # create a cursor
-            # display the PostgreSQL database server version
-            LOGGER.info('PostgreSQL database version:')
-            cur.execute('SELECT version()')
-            db_version = cur.fetchone()
-            LOGGER.info(db_version)
+        # libpq only knows 'dbname', the config files usually use 'database'
+        database = params.pop("database", None)
+        params.setdefault("dbname", database)
+        LOGGER.info("Connecting to the PostgreSQL database '%s'...",
+                    params["dbname"])
+        _POOL = ConnectionPool(kwargs=params, min_size=1, max_size=4,
+                               configure=_log_version, open=True)
+        atexit.register(_POOL.close)
+    return _POOL
+
+
+def connect():
+    """Borrow a connection from the pool, to be used as a context manager."""
+    try:
+        return get_pool().connection()
     except (Exception, pg.DatabaseError) as error:
         LOGGER.error(error)
         raise error
-    return conn
 
 
 def create_json(
@@ -525,22 +585,22 @@ def create_json(
 
     try:
         with connect() as connection:
-            # get type of problem
+            # get type of problem and the number of vertices together
             with connection.cursor() as cur:
-                ptype = query_problem(cur, problem)
+                ptype, num_vars = query_problem(cur, problem)
 
             # select the valid constructor for the problem
             constructor: IDpdbVisuConstruct
 
             if ptype == 'Sat':
                 constructor = DpdbSatVisu(
-                    connection, problem, intermed_nodes)
+                    connection, problem, intermed_nodes, num_vars)
             elif ptype == 'SharpSat':
                 constructor = DpdbSharpSatVisu(
-                    connection, problem, intermed_nodes)
+                    connection, problem, intermed_nodes, num_vars)
             elif ptype == 'VertexCover':
                 constructor = DpdbMinVcVisu(
-                    connection, problem, intermed_nodes, tw_file)
+                    connection, problem, intermed_nodes, tw_file, num_vars)
 
             LOGGER.info("Using %s for type=%s",
                         constructor.__class__.__name__, ptype)
@@ -595,12 +655,27 @@ def main(args: List[str]) -> None:
         tw_file_ = None
 
     # create JSON
-    result_json = create_json(problem=problem_, tw_file=tw_file_)
+    result_json = create_json(problem=problem_, tw_file=tw_file_,
+                              intermed_nodes=options.inter_nodes)
     try:    # build json filename, can be supplied with problem-number
         outfile = options.outfile % problem_
     except TypeError:
         outfile = options.outfile
     LOGGER.info("Output file-name: %s", outfile)
+    if orjson is not None:
+        option = orjson.OPT_SORT_KEYS
+        if options.pretty:
+            option |= orjson.OPT_INDENT_2
+        try:  # orjson encodes to UTF-8 bytes directly
+            encoded = orjson.dumps(result_json, option=option)
+        except orjson.JSONEncodeError as err:
+            # e.g. model counts beyond 64 bit, json handles any int
+            LOGGER.info("Falling back to json: %s", err)
+        else:
+            with open(outfile, 'wb') as file:
+                file.write(encoded)
+                LOGGER.debug("Wrote to %s", file)
+            return
     with open(outfile, 'w') as file:
         json.dump(
             result_json,
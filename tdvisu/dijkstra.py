@@ -45,7 +45,6 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
 from heapq import heappop, heappush
-from itertools import count
 
 
 def bidirectional_dijkstra(edges, source, target, weight="weight"):
@@ -123,65 +122,91 @@ def bidirectional_dijkstra(edges, source, target, weight="weight"):
     if source == target:
         return (0, [source])
 
+    # the common attribute lookup is inlined below instead of calling weight
+    weight_key = None if callable(weight) else weight
     weight = _weight_function(weight)
     push = heappush
     pop = heappop
     # Init:  [Forward, Backward]
     dists = [{}, {}]  # dictionary of final distances
-    paths = [{source: [source]}, {target: [target]}]  # dictionary of paths
+    preds = [{}, {}]  # predecessor on the path from source / target
     fringe = [[], []]  # heap of (distance, node) for choosing node to expand
     seen = [{source: 0}, {target: 0}]  # dict of distances to seen nodes
 
-    # initialize fringe heap
-    push(fringe[0], (0, next(count()), source))
-    push(fringe[1], (0, next(count()), target))
+    # initialize fringe heap, ties are broken by the order of the pushes
+    # so that the nodes themselves never get compared
+    push(fringe[0], (0, 0, source))
+    push(fringe[1], (0, 1, target))
+    pushes = 2
     # neighs for extracting correct neighbor information
     neighs = [edges, edges]
     # variables to hold shortest discovered path
     finaldist = float("inf")
-    finalpath = []
+    finalnode = None  # where the forward and backward path meet
+    found = False
     direction = 1
     while fringe[0] and fringe[1]:
         # choose direction
         # direction == 0 is forward direction and direction == 1 is back
         direction = 1 - direction
+        # local names for the containers of this and the other direction
+        own_dists, other_dists = dists[direction], dists[1 - direction]
+        own_seen, other_seen = seen[direction], seen[1 - direction]
+        own_fringe, own_preds = fringe[direction], preds[direction]
         # extract closest to expand
-        (dist, _, v) = pop(fringe[direction])
-        if v in dists[direction]:
+        (dist, _, v) = pop(own_fringe)
+        if v in own_dists:
             # Shortest path to v has already been found
             continue
         # update distance
-        dists[direction][v] = dist  # equal to seen[direction][v]
-        if v in dists[1 - direction]:
+        own_dists[v] = dist  # equal to own_seen[v]
+        if v in other_dists:
             # if we have scanned v in both directions we are done
             # we have now discovered the shortest path
-            return (finaldist, finalpath)
+            return (finaldist, _join_paths(preds, finalnode, source, target))
 
         for w, d in neighs[direction][v].items():
-            if direction == 0:  # forward
-                vw_length = dists[direction][v] + weight(v, w, d)
+            if weight_key is not None:
+                vw_length = dist + d.get(weight_key, 1)
+            elif direction == 0:  # forward
+                vw_length = dist + weight(v, w, d)
             else:  # back, must remember to change v,w->w,v
-                vw_length = dists[direction][v] + weight(w, v, d)
-            if w in dists[direction]:
-                if vw_length < dists[direction][w]:
+                vw_length = dist + weight(w, v, d)
+            if w in own_dists:
+                if vw_length < own_dists[w]:
                     raise ValueError("Contradictory paths found: negative weights?")
-            elif w not in seen[direction] or vw_length < seen[direction][w]:
+            elif w not in own_seen or vw_length < own_seen[w]:
                 # relaxing
-                seen[direction][w] = vw_length
-                push(fringe[direction], (vw_length, next(count()), w))
-                paths[direction][w] = paths[direction][v] + [w]
-                if w in seen[0] and w in seen[1]:
+                own_seen[w] = vw_length
+                push(own_fringe, (vw_length, pushes, w))
+                pushes += 1
+                own_preds[w] = v
+                if w in other_seen:
                     # see if this path is better than than the already
                     # discovered shortest path
-                    totaldist = seen[0][w] + seen[1][w]
-                    if finalpath == [] or finaldist > totaldist:
+                    totaldist = vw_length + other_seen[w]
+                    if not found or finaldist > totaldist:
                         finaldist = totaldist
-                        revpath = paths[1][w][:]
-                        revpath.reverse()
-                        finalpath = paths[0][w] + revpath[1:]
+                        finalnode = w
+                        found = True
     raise DijkstraNoPath(f"No path between {source} and {target}.")
 
 
+def _join_paths(preds, node, source, target) -> list:
+    """Follow the predecessors from 'node' back to the source and the target."""
+    meet = node
+    path = [node]
+    while node != source:
+        node = preds[0][node]
+        path.append(node)
+    path.reverse()
+    node = meet
+    while node != target:
+        node = preds[1][node]
+        path.append(node)
+    return path
+
+
 class DijkstraNoPath(RuntimeError):
     """Raised when there was no path found during Dijkstra algorithm"""
 
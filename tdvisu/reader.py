@@ -42,9 +42,10 @@ from __future__ import annotations
 
 import logging
 import sys
-from typing import Iterable
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
-from tdvisu.utilities import add_edge_to
+from tdvisu.utilities import convert_to_csr
 
 logger = logging.getLogger("reader.py")
 
@@ -90,7 +91,7 @@ class DimacsReader(Reader):
         self._problem_vars = None
 
     def parse(self, string) -> None:
-        lines = string.split("\n")
+        lines = string.splitlines()
         body_start = self.preamble(lines)
         self.store_problem_vars()
         self.body(lines[body_start:])
@@ -135,28 +136,88 @@ class DimacsReader(Reader):
 
 class TwReader(DimacsReader):
     """Dimacs Reader for the 'tw' format (saving directed edges).
-    Stores edges and adjacency together with
-    the number of vertices and number of edges.
+    Stores edges together with the number of vertices and number of edges.
+    The adjacency is built from the edges on first use and built again
+    after assigning new edges. Changing the set of edges in place
+    is not noticed, assign the changed edges instead.
     """
 
     def __init__(self):
         super().__init__()
-        self.edges = set()
-        self.adjacency_dict = dict()
         self.num_vertices = self.num_edges = None
+        self.edges = set()
+
+    @property
+    def edges(self) -> Set[Tuple[int, int]]:
+        """The directed edges as read from the file."""
+        return self._edges
+
+    @edges.setter
+    def edges(self, edges: Set[Tuple[int, int]]) -> None:
+        self._edges = edges
+        self._clear_adjacency()
+
+    def _clear_adjacency(self) -> None:
+        """Forget the adjacency built from the previous edges."""
+        self._csr: Optional[Tuple[list, array, array]] = None
+        self._position: Dict[int, int] = {}
+        self._adjacency_dict: Optional[Dict[int, Set[int]]] = None
+
+    @property
+    def csr(self) -> Tuple[list, array, array]:
+        """The undirected adjacency (vertices, indptr, indices) in the
+        compressed sparse row format, see utilities.convert_to_csr.
+        The neighbors of every vertex are sorted.
+        """
+        if self._csr is None:
+            undirected = {
+                (vertex1, vertex2) if vertex1 <= vertex2 else (vertex2, vertex1)
+                for vertex1, vertex2 in self.edges
+            }
+            self._csr = convert_to_csr(sorted(undirected))
+            self._position = {vertex: i for i, vertex in enumerate(self._csr[0])}
+        return self._csr
+
+    def neighbors(self, vertex: int) -> List[int]:
+        """Return the sorted neighbors of the vertex."""
+        vertices, indptr, indices = self.csr
+        position = self._position.get(vertex)
+        if position is None:
+            return []
+        return [vertices[i] for i in indices[indptr[position] : indptr[position + 1]]]
+
+    @property
+    def adjacency_dict(self) -> Dict[int, Set[int]]:
+        """Adjacent vertices for each vertex."""
+        if self._adjacency_dict is None:
+            vertices, indptr, indices = self.csr
+            self._adjacency_dict = {
+                vertex: {vertices[j] for j in indices[indptr[i] : indptr[i + 1]]}
+                for i, vertex in enumerate(vertices)
+            }
+        return self._adjacency_dict
+
+    @adjacency_dict.setter
+    def adjacency_dict(self, adjacency_dict: Dict[int, Set[int]]) -> None:
+        self._adjacency_dict = adjacency_dict
 
     def store_problem_vars(self):
         self.num_vertices = int(self._problem_vars[0])
         self.num_edges = int(self._problem_vars[1])
 
     def body(self, lines) -> None:
-        """Store the content from the given lines in the edges and adjacency_dict."""
+        """Store the content from the given lines in the edges."""
         if self.format not in ("col", "tw"):
             logger.error("Not a tw file!")
             sys.exit(1)
 
+        sources: List[int] = []
+        targets: List[int] = []
+        # local names for the calls made on every line
+        add_source, add_target = sources.append, targets.append
         for lineno, line in enumerate(lines):
-            if not line or self.is_comment(line):
+            # inlined is_comment: 'c' alone or followed by a space
+            if not line or (line[0] == "c" and (len(line) == 1 or line[1] == " ")):
                 continue
 
             line = line.split()
@@ -166,10 +227,11 @@ class TwReader(DimacsReader):
                     lineno,
                     len(line),
                 )
-            vertex1 = int(line[0])
-            vertex2 = int(line[1])
+            add_source(int(line[0]))
+            add_target(int(line[1]))
 
-            add_edge_to(self.edges, self.adjacency_dict, vertex1, vertex2)
+        self.edges.update(zip(sources, targets))
+        self._clear_adjacency()
 
         if len(self.edges) != self.num_edges:
             logger.warning(
@@ -22,11 +22,14 @@ Copyright (C) 2020-2024 Martin Röbke
 """
 
 import logging
-import re
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from functools import partial
 from pathlib import Path
-from typing import Dict, Iterable, List, Union
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
-from benedict import benedict
+import xmltodict
 
 from tdvisu.utilities import gen_arg
 
@@ -46,6 +49,31 @@ def test_viewbox(viewbox: List[float]):
     assert viewbox[HEIGHT] > 0, "should have positive height"
 
 
+def parse_viewbox(viewbox: str) -> List[float]:
+    """The numbers in the viewBox, separated by whitespace and/or a comma."""
+    return [float(x) for x in viewbox.replace(",", " ").split()]
+
+
+def read_svg(path: str, cache: Optional[Dict[bytes, Optional[dict]]] = None) -> dict:
+    """Parse the svg file at 'path' into a plain xml-svg dictionary.
+
+    With a 'cache' files repeating the content of an earlier file are parsed
+    only once, each of them gets its own copy to modify.
+    """
+    with open(path, "rb") as file:
+        content = file.read()
+    if cache is None:
+        return xmltodict.parse(content)
+    if content not in cache:
+        # the first tree gets modified by the caller, keep one only on reuse
+        cache[content] = None
+        return xmltodict.parse(content)
+    tree = cache[content]
+    if tree is None:
+        tree = cache[content] = xmltodict.parse(content)
+    return deepcopy(tree)
+
+
 def append_svg(
     first_dict: dict,
     snd_dict: dict,
@@ -54,6 +82,7 @@ def append_svg(
     v_top: float = None,
     scale2: float = 1,
     ndigits: int = 3,
+    first_viewbox: Optional[List[float]] = None,
 ) -> dict:
     """Modifies the first of two xml-svg dictionary containing a viewbox to
     append the second svg to the right of the first image.
@@ -82,6 +111,9 @@ def append_svg(
         Optional scaling.
     ndigits : int, optional
         Rounding results to that many decimal places. The default is 3.
+    first_viewbox : list of float, optional
+        The viewBox of first_dict if already parsed, see parse_viewbox.
+        Gets updated in place to the new viewBox.
 
     Returns
     -------
@@ -101,19 +133,18 @@ def append_svg(
     # See also
     # https://developer.mozilla.org/en-US/docs/Web/SVG/Attribute/viewBox
 
-    pattern = re.compile(r"\s*,\s*|\s+")
-    viewbox1: List[float] = list(map(float, re.split(pattern, first_svg["@viewBox"])))
-    viewbox2: List[float] = list(map(float, re.split(pattern, second_svg["@viewBox"])))
+    viewbox1: List[float] = (
+        parse_viewbox(first_svg["@viewBox"]) if first_viewbox is None else first_viewbox
+    )
+    viewbox2: List[float] = parse_viewbox(second_svg["@viewBox"])
 
-    test_viewbox(viewbox1)  # viewbox1 validation
-    test_viewbox(viewbox2)  # viewbox2 validation
+    if __debug__:  # skipped entirely under 'python -O' like the asserts
+        test_viewbox(viewbox1)  # viewbox1 validation
+        test_viewbox(viewbox2)  # viewbox2 validation
 
-    trafo_result = f_transform(
+    vertical_snd, combine_height, scale2 = f_transform(
         viewbox1[HEIGHT], viewbox2[HEIGHT], v_bottom, v_top, scale2
     )
-    vertical_snd = trafo_result["vertical_snd"]
-    combine_height = trafo_result["combine_height"]
-    scale2 = trafo_result["scale2"]
 
     LOGGER.info(
         "Transformed with vertical_snd=%s combine_height=%s scale2=%s",
@@ -126,8 +157,9 @@ def append_svg(
         max(float(viewbox1[WIDTH]), h_displacement + scale2 * viewbox2[WIDTH]) - 0.5
     )
 
-    # new viewbox
-    first_svg["@viewBox"] = " ".join(map(str, viewbox1))  # new viewbox
+    # new viewbox, the min-x and min-y stay as read, width and height are ints now
+    min_x, min_y, width, height = viewbox1
+    first_svg["@viewBox"] = f"{min_x} {min_y} {width} {height}"
     # update width and height
     first_svg["@width"] = f"{viewbox1[WIDTH]}pt"
     first_svg["@height"] = f"{viewbox1[HEIGHT]}pt"
@@ -166,6 +198,18 @@ TRANSFORMATION_EXAMPLE = """
  V (0,1.3)
 """
 
+# positions for v_bottom, v_top given by name
+_VPOS_CONVERSION = MappingProxyType(
+    {
+        "bottom": 1,
+        "center": 0.5,
+        "top": 0,
+        "inf": 0,
+        -float("inf"): 1,
+        float("inf"): 0,
+    }
+)
+
 
 def f_transform(
     h_one_,
@@ -173,7 +217,7 @@ def f_transform(
     v_bottom: Union[float, str, None] = None,
     v_top: Union[float, str, None] = None,
     scale2: float = 1,
-) -> Dict[str, float]:
+) -> Tuple[float, float, float]:
     """Calculate vertical position and scaling of second image.
 
     The input for v_bottom, v_top is in units from\n
@@ -198,8 +242,8 @@ def f_transform(
 
     Returns
     -------
-    dict[str->float]
-        'vertical_snd','combine_height','scale2'
+    tuple[float, float, float]
+        vertical_snd, combine_height, scale2
 
     """
     v_displacement = 0.0
@@ -208,14 +252,7 @@ def f_transform(
     h_two = float(h_two_)
     LOGGER.debug("Calculating with h_one=%f h_two=%f", h_one, h_two)
     # normalize values
-    conversion = {
-        "bottom": 1,
-        "center": 0.5,
-        "top": 0,
-        "inf": 0,
-        -float("inf"): 1,
-        float("inf"): 0,
-    }
+    conversion = _VPOS_CONVERSION
     v_bottom = conversion.get(v_bottom, v_bottom)
     if isinstance(v_bottom, str):
         raise ValueError(f"Encountered {v_bottom=} not in {conversion=}")
@@ -258,11 +295,37 @@ def f_transform(
     # bottom - top
     combine_height = (max(1, v_bottom) - min(0, v_top)) * h_one
 
-    return {
-        "vertical_snd": v_displacement,
-        "combine_height": combine_height,
-        "scale2": scale2,
-    }
+    return v_displacement, combine_height, scale2
+
+
+def join_step(
+    names: List[str],
+    resultname: str,
+    preserve_aspectratio: str,
+    step: int,
+    append_args: List[dict],
+    cache: Optional[Dict[bytes, Optional[dict]]] = None,
+) -> str:
+    """Join the images of one timestep and write them to 'resultname' % step.
+
+    Every entry in append_args holds the keyword arguments to append_svg
+    for the image at the same position in names[1:].
+    The optional 'cache' is handed on to read_svg.
+    Returns the name of the written file.
+    """
+    result = read_svg(names[0] % step, cache)
+    # kept up to date by append_svg instead of parsing it again each time
+    viewbox = parse_viewbox(result["svg"]["@viewBox"])
+    for name, kwargs in zip(names[1:], append_args):
+        result = append_svg(
+            result, read_svg(name % step, cache), first_viewbox=viewbox, **kwargs
+        )
+
+    result["svg"]["@preserveAspectRatio"] = preserve_aspectratio
+    # unparse streams the elements into the file in the declared utf-8
+    with open(resultname % step, "wb") as file:
+        xmltodict.unparse(result, output=file, pretty=True)
+    return resultname % step
 
 
 def svg_join(
@@ -276,6 +339,7 @@ def svg_join(
     scale2: Union[float, Iterable[float]] = 1,
     v_top: Union[None, float, str, Iterable[Union[None, float, str]]] = None,
     v_bottom: Union[None, float, str, Iterable[Union[None, float, str]]] = None,
+    max_workers: Optional[int] = None,
 ):
     """
     Joines different svg-images from tdvisu placed in 'folder' for every timestep
@@ -308,6 +372,11 @@ def svg_join(
         Expected position of bottom of second image. The default is None.
     v_top : float or str, optional
         Expected position of bottom of second image. The default is None.
+    max_workers : int, optional
+        Number of processes joining the timesteps in parallel, at most one
+        per timestep. On platforms starting the processes with 'spawn' the
+        calling script needs an ``if __name__ == "__main__":`` guard.
+        The default is None, joining all timesteps in this process.
 
 
     Returns
@@ -334,42 +403,33 @@ def svg_join(
     gen_scale2 = gen_arg(scale2)
     gen_v_top = gen_arg(v_top)
     gen_v_bottom = gen_arg(v_bottom)
+    # draw the arguments for every step up front, so the steps are independent
+    step_args = [
+        [
+            {
+                "centerpad": next(gen_padding),
+                "v_bottom": next(gen_v_bottom),
+                "v_top": next(gen_v_top),
+                "scale2": next(gen_scale2),
+            }
+            for _ in names[1:]
+        ]
+        for _ in range(num_images)
+    ]
+
+    # parsed images repeated over the timesteps, only kept for this call
+    join = partial(join_step, names, resultname, preserve_aspectratio, cache={})
+    steps = range(1, num_images + 1)
+    # worker processes only when the caller opts in
+    max_workers = min(max_workers or 1, num_images)
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            written = list(executor.map(join, steps, step_args))
+    else:
+        written = list(map(join, steps, step_args))
 
-    for step in range(1, num_images + 1):
-        # first - needs at least two images
-        with open(names[0] % step) as file:
-            im_1 = benedict.from_xml(file.read())
-        with open(names[1] % step) as file:
-            im_2 = benedict.from_xml(file.read())
-
-        result = append_svg(
-            im_1,
-            im_2,
-            centerpad=next(gen_padding),
-            v_bottom=next(gen_v_bottom),
-            v_top=next(gen_v_top),
-            scale2=next(gen_scale2),
-        )
-
-        # rest:
-        for name in names[2:]:
-            with open(name % step) as file:
-                image = benedict.from_xml(file.read())
-            result = append_svg(
-                result,
-                image,
-                centerpad=next(gen_padding),
-                v_bottom=next(gen_v_bottom),
-                v_top=next(gen_v_top),
-                scale2=next(gen_scale2),
-            )
-
-        result["svg"]["@preserveAspectRatio"] = preserve_aspectratio
-        with open(resultname % step, "w") as file:
-            result.to_xml(output=file, pretty=True)
-
-        if step < 10:
-            LOGGER.debug("Wrote combined: %s", resultname % step)
+    for combined in written[:9]:
+        LOGGER.debug("Wrote combined: %s", combined)
     LOGGER.info("Finished svg_join")
 
 
@@ -24,6 +24,8 @@ Copyright (C) 2020-2024 Martin Röbke
 import argparse
 import logging
 import logging.config
+from array import array
+from collections import defaultdict
 from collections.abc import Iterable as iter_type
 from configparser import ConfigParser
 from configparser import Error as CfgError
@@ -221,17 +223,120 @@ def convert_to_adj(edgelist: Iterable[Tuple[int, int]], directed: bool = False)
         Basically: dict of {source1:{target1:{'attr1':value,},},...}
         https://networkx.github.io/documentation/networkx-2.1/_modules/networkx/classes/graph.html
     """
-    adj = dict()
+    adj: defaultdict = defaultdict(dict)
     for source, target in edgelist:
-        if source not in adj:
-            adj[source] = {}
         adj[source][target] = {}
         if not directed:
             # add reversed edge
-            if target not in adj:
-                adj[target] = {}
             adj[target][source] = {}
-    return adj
+    return dict(adj)
+
+
+def convert_to_csr(edgelist: Iterable[Tuple[int, int]]) -> Tuple[list, array, array]:
+    """
+    Helper function to convert the edgelist into undirected adjacency arrays
+    in the compressed sparse row (CSR) format.
+
+    Parameters
+    ----------
+    edgelist : array-like of pairs of vertices.
+        Simple edgelist. Example:
+            [(2, 1), (3, 2), (4, 2), (5, 4)]
+
+    Returns
+    -------
+    (vertices, indptr, indices) : tuple
+        The vertices in order of appearance, each identified by its position.
+        The neighbors of the vertex at position i are at the positions
+        indices[indptr[i]:indptr[i + 1]].
+    """
+    position = {}
+    sources = array('i')
+    targets = array('i')
+    for source, target in edgelist:
+        sources.append(position.setdefault(source, len(position)))
+        targets.append(position.setdefault(target, len(position)))
+    indptr = array('i', bytes(4 * (len(position) + 1)))
+    for source, target in zip(sources, targets):
+        indptr[source + 1] += 1
+        indptr[target + 1] += 1
+    for i in range(len(position)):
+        indptr[i + 1] += indptr[i]
+    indices = array('i', bytes(4 * indptr[-1]))
+    fill = indptr[:-1]
+    for source, target in zip(sources, targets):
+        indices[fill[source]] = target
+        fill[source] += 1
+        indices[fill[target]] = source
+        fill[target] += 1
+    return list(position), indptr, indices
+
+
+def tree_parents(csr: Tuple[list, array, array], root: Any) -> Tuple[dict, dict]:
+    """
+    Breadth first search from 'root' on the tree described by 'csr'.
+
+    Parameters
+    ----------
+    csr : tuple of vertices, indptr and indices
+        Adjacency arrays of the tree, for example from convert_to_csr.
+    root : any
+        Vertex to root the tree at.
+
+    Returns
+    -------
+    (parent, depth) : tuple of dicts
+        The parent (None for the root) and the depth of each reachable vertex.
+    """
+    vertices, indptr, indices = csr
+    if root not in vertices:  # isolated vertex without any edges
+        return {root: None}, {root: 0}
+    start = vertices.index(root)
+    parents = [-1] * len(vertices)
+    depths = [0] * len(vertices)
+    parents[start] = start
+    order = [start]
+    # the visited vertices double as the queue
+    for current in order:
+        for neighbor in indices[indptr[current]:indptr[current + 1]]:
+            if parents[neighbor] < 0:
+                parents[neighbor] = current
+                depths[neighbor] = depths[current] + 1
+                order.append(neighbor)
+    parent = {vertices[i]: vertices[parents[i]] for i in order}
+    parent[root] = None
+    depth = {vertices[i]: depths[i] for i in order}
+    return parent, depth
+
+
+def tree_path(parent: dict, depth: dict, source: Any, target: Any) -> List[Any]:
+    """
+    The unique path between two vertices of a tree.
+
+    Both vertices climb towards their lowest common ancestor
+    using the results of tree_parents.
+
+    Returns
+    -------
+    path : list
+        Vertices from 'source' to 'target', both included.
+    """
+    head, tail = [source], [target]
+    while depth[source] > depth[target]:
+        source = parent[source]
+        head.append(source)
+    while depth[target] > depth[source]:
+        target = parent[target]
+        tail.append(target)
+    while source != target:
+        source = parent[source]
+        target = parent[target]
+        head.append(source)
+        tail.append(target)
+    # the common ancestor is the last element of both lists
+    tail.pop()
+    head.extend(reversed(tail))
+    return head
 
 
 def add_edge_to(edges: set, adjacency_dict: dict, vertex1: Any, vertex2: Any) -> None:
@@ -255,14 +360,17 @@ def add_edge_to(edges: set, adjacency_dict: dict, vertex1: Any, vertex2: Any) ->
     None
 
     """
-    if vertex1 in adjacency_dict:
-        adjacency_dict[vertex1].add(vertex2)
-    else:
+    # one lookup for each vertex that is already known
+    neighbors = adjacency_dict.get(vertex1)
+    if neighbors is None:
         adjacency_dict[vertex1] = {vertex2}
-    if vertex2 in adjacency_dict:
-        adjacency_dict[vertex2].add(vertex1)
     else:
+        neighbors.add(vertex2)
+    neighbors = adjacency_dict.get(vertex2)
+    if neighbors is None:
         adjacency_dict[vertex2] = {vertex1}
+    else:
+        neighbors.add(vertex1)
     edges.add((vertex1, vertex2))
 
 
@@ -397,18 +505,29 @@ def solution_node(
     | botlabel |
     |----------|
     """
-    result = ""
+    parts: List[str] = []  # joined once at the end
+    add = parts.append
     if toplabel:
-        result += toplabel + "|"
+        add(toplabel + "|")
 
     if len(solution_table) == 0:
-        result += "empty"
+        add("empty")
     else:
         if transpose:
-            solution_table = list(zip(*solution_table))
-
-        # limit lines backwards from length of column
-        vslice = min(-1, linesmax - len(solution_table[0])) if linesmax > 0 else -1
+            # limit lines backwards from the number of lines
+            vslice = min(-1, linesmax - len(solution_table)) if linesmax > 0 else -1
+            shortened = vslice < -1
+            if shortened:  # transpose only the lines that get displayed
+                width = min(map(len, solution_table))  # like zip over all lines
+                lines = solution_table[:vslice] + solution_table[-1:]
+                solution_table = list(zip(*lines))[:width]
+                vslice = -1
+            else:
+                solution_table = list(zip(*solution_table))
+        else:
+            # limit lines backwards from length of column
+            vslice = min(-1, linesmax - len(solution_table[0])) if linesmax > 0 else -1
+            shortened = vslice < -1
         # limit columns forwards minus one
         hslice = (
             min(len(solution_table), columnsmax)
@@ -416,42 +535,42 @@ def solution_node(
             else len(solution_table)
         ) - 1
 
-        result += "{"  # insert table
+        add("{")  # insert table
         for column in solution_table[:hslice]:
-            result += "{"  # start column
+            add("{")  # start column
             for row in column[:vslice]:
-                result += str(row) + "|"
-            if vslice < -1:  # add one indicator of shortening
-                result += fillstr + "|"
+                add(str(row) + "|")
+            if shortened:  # add one indicator of shortening
+                add(fillstr + "|")
             for row in column[-1:]:
-                result += str(row)
-            result += "}|"  # sep. between columns
+                add(str(row))
+            add("}|")  # sep. between columns
         # adding one column-skipping indicator
         if hslice < len(solution_table) - 1:
-            result += "{"  # start column
+            add("{")  # start column
             for row in column[:vslice]:
-                result += fillstr + "|"
-            if vslice < -1:  # add one indicator of shortening
-                result += fillstr + "|"
+                add(fillstr + "|")
+            if shortened:  # add one indicator of shortening
+                add(fillstr + "|")
             for row in column[-1:]:
-                result += fillstr
-            result += "}|"  # sep. between columns
+                add(fillstr)
+            add("}|")  # sep. between columns
         # last column (usually a summary of the previous cols)
         for column in solution_table[-1:]:
-            result += "{"  # start column
+            add("{")  # start column
             for row in column[:vslice]:
-                result += str(row) + "|"
-            if vslice < -1:  # add one indicator of shortening
-                result += fillstr + "|"
+                add(str(row) + "|")
+            if shortened:  # add one indicator of shortening
+                add(fillstr + "|")
             for row in column[-1:]:
-                result += str(row)
-            result += "}"  # sep. between columns
-        result += "}"  # close table
+                add(str(row))
+            add("}")  # sep. between columns
+        add("}")  # close table
 
     if bottomlabel:
-        result += "|" + bottomlabel
+        add("|" + bottomlabel)
 
-    return "{" + result + "}"
+    return "{" + "".join(parts) + "}"
 
 
 def get_parser(extra_desc: str = "") -> argparse.ArgumentParser:
@@ -22,10 +22,12 @@ Copyright (C) 2020-2024 Martin Röbke
 """
 
 import datetime
+import json
 from pathlib import Path
 from unittest.mock import PropertyMock
 
 import psycopg as pg
+from pytest import mark, raises
 
 from tdvisu import construct_dpdb_visu as module
 from tdvisu.construct_dpdb_visu import (
@@ -65,6 +67,17 @@ def test_db_config():
     }, "should complete 'database' with default."
 
 
+def test_read_cfg_cached(mocker):
+    """The file is parsed once, the callers get their own copies."""
+    module._read_cfg_cached.cache_clear()
+    spy = mocker.spy(module, "read_yml_or_cfg")
+    first = read_cfg(DIR / "database.ini", SECTION, True)
+    first["user"] = "changed"
+    second = read_cfg(DIR / "database.ini", SECTION, True)
+    assert second["user"] == "postgres"
+    assert spy.call_count == 1
+
+
 def test_db2_config():
     """Test should use defaults when file not found."""
     fixed_defaults = db_config(DIR / "database2.ini", SECTION)
@@ -91,22 +104,58 @@ def test_problem_interface():
     assert issubclass(DpdbMinVcVisu, IDpdbVisuConstruct)
 
 
-def test_main(mocker, tmp_path):
+def test_connection_timeout(mocker):
+    """Give up on a connection that does not become usable."""
+    mock_db = mocker.MagicMock()
+    mock_db.info.status = pg.pq.ConnStatus.BAD
+    mock_sleep = mocker.patch("tdvisu.construct_dpdb_visu.sleep")
+    mocker.patch(
+        "tdvisu.construct_dpdb_visu.monotonic", side_effect=[0.0, 1.0, 5.0]
+    )
+    with raises(pg.OperationalError):
+        DpdbSharpSatVisu(mock_db, 1, False)
+    mock_sleep.assert_called_once()
+
+
+@mark.parametrize("config, dbname", [
+    ({"database": "logicsem", "host": "localhost"}, "logicsem"),
+    ({"database": "logicsem", "dbname": "other", "host": "localhost"}, "other"),
+])
+def test_get_pool_dbname(mocker, config, dbname):
+    """The configured 'dbname' wins over the 'database' default."""
+    mocker.patch("tdvisu.construct_dpdb_visu._POOL", None)
+    mocker.patch("tdvisu.construct_dpdb_visu.atexit")
+    mocker.patch("tdvisu.construct_dpdb_visu.db_config", return_value=config)
+    mock_pool = mocker.patch("tdvisu.construct_dpdb_visu.ConnectionPool")
+    module.get_pool()
+    assert mock_pool.call_args.kwargs["kwargs"] == {
+        "dbname": dbname, "host": "localhost"}
+
+
+@mark.parametrize("ptype, footer",
+                  [("Sat", ""), ("SharpSat", f"sum: {2**70 + 2}")])
+@mark.parametrize("orjson", [module.orjson, None], ids=["orjson", "json"])
+def test_main(mocker, tmp_path, orjson, ptype, footer):
     """Test behaviour of construct_dpdb_visu.main"""
 
-    mock_connect = mocker.patch("tdvisu.construct_dpdb_visu.pg.connect")
-    mock_status = mocker.patch(
-        "tdvisu.construct_dpdb_visu.pg.connect.return_value.__enter__.return_value.info"
+    mocker.patch.object(module, "orjson", orjson)
+
+    mocker.patch("tdvisu.construct_dpdb_visu._POOL", None)
+    mocker.patch("tdvisu.construct_dpdb_visu.atexit")
+    mock_pool = mocker.patch("tdvisu.construct_dpdb_visu.ConnectionPool")
+    mock_connect = mock_pool.return_value.connection
+    mock_status = mocker.patch.object(
+        mock_connect.return_value.__enter__.return_value, "info"
     )
     type(mock_status).status = PropertyMock(
         side_effect=[pg.pq.ConnStatus.BAD, pg.pq.ConnStatus.OK]
     )
 
     query_problem = mocker.patch(
-        "tdvisu.construct_dpdb_visu.query_problem", return_value="Sat"
+        "tdvisu.construct_dpdb_visu.query_problem", return_value=(ptype, 8)
     )
     query_num_vars = mocker.patch(
-        "tdvisu.construct_dpdb_visu.query_num_vars", return_value=8
+        "tdvisu.construct_dpdb_visu.query_num_vars", return_value=-1
     )
     query_td_node_status_ordered = mocker.patch(
         "tdvisu.construct_dpdb_visu.query_td_node_status_ordered",
@@ -128,34 +177,37 @@ def test_main(mocker, tmp_path):
         ],
     )
 
-    query_td_bag_grouped = mocker.patch(
-        "tdvisu.construct_dpdb_visu.query_td_bag_grouped",
-        return_value=[[1, 2, 3, 4, 5]],
-    )
     query_td_node_status = mocker.patch(
         "tdvisu.construct_dpdb_visu.query_td_node_status",
-        return_value=(
-            "2020-07-13 02:06:18.053880",
-            datetime.timedelta(microseconds=768),
-        ),
+        return_value=[
+            (
+                bag,
+                "2020-07-13 02:06:18.053880",
+                datetime.timedelta(microseconds=768),
+            )
+            for bag in range(1, 6)
+        ],
     )
     query_td_bag = mocker.patch(
-        "tdvisu.construct_dpdb_visu.query_td_bag", return_value=[(1,), (2,), (4,), (6,)]
+        "tdvisu.construct_dpdb_visu.query_td_bag",
+        return_value=[(bag, [1, 2, 4, 6]) for bag in range(1, 6)],
     )
-    query_column_name = mocker.patch(
-        "tdvisu.construct_dpdb_visu.query_column_name",
-        return_value=[("v1",), ("v2",), ("v4",), ("v6",)],
-    )
-    query_bag = mocker.patch(
-        "tdvisu.construct_dpdb_visu.query_bag",
+    query_bags = mocker.patch(
+        "tdvisu.construct_dpdb_visu.query_bags",
         return_value=[
-            (False, None, False, None),
-            (True, None, True, None),
-            (False, None, True, None),
-            (True, None, False, None),
+            (
+                bag,
+                ["v1", "v2", "v4", "v6", "model_count"],
+                [
+                    (False, None, False, None, 1),
+                    (True, None, True, None, 2**70),
+                    (False, None, True, None, 1),
+                    (True, None, False, None, 0),
+                ],
+            )
+            for bag in range(1, 6)
         ],
     )
-
     query_edgearray = mocker.patch(
         "tdvisu.construct_dpdb_visu.query_edgearray",
         return_value=[(2, 1), (3, 2), (4, 2), (5, 4)],
@@ -164,19 +216,28 @@ def test_main(mocker, tmp_path):
     outfile = str(tmp_path / "test_main.json")
     # one mocked run
     main(["1", "--outfile", outfile])
+    with open(outfile, encoding="utf-8") as file:
+        result = json.load(file)
 
     # Assertions
+    mock_pool.assert_called_once()
     mock_connect.assert_called_once()
     query_problem.assert_called_once()
-    query_num_vars.assert_called_once()
-    query_td_bag_grouped.assert_called_once()
+    query_num_vars.assert_not_called()
     query_sat_clause.assert_called_once()
     query_td_node_status_ordered.assert_called_once()
     query_edgearray.assert_called_once()
-    assert query_bag.call_count == 5
-    assert query_column_name.call_count == 5
-    assert query_td_bag.call_count == 5
-    assert query_td_node_status.call_count == 5
+    query_bags.assert_called_once()
+    query_td_bag.assert_called_once()
+    query_td_node_status.assert_called_once()
+    assert sorted(result) == ["incidenceGraph", "tdTimeline", "treeDecJson"]
+    assert result["treeDecJson"]["num_vars"] == 8
+    # the nulled columns are left out of the solution tables
+    assert result["tdTimeline"][1][1][0][0] == ["v1", "v4", "model_count"]
+    # counts beyond 64 bit, which orjson can not encode, still get written
+    assert result["tdTimeline"][1][1][0][2] == [1, 1, 2**70]
+    # the footer folds the last value of every line
+    assert result["tdTimeline"][1][1][2] == footer
 
 
 def test_init(mocker):
@@ -87,6 +87,16 @@ class TestShortestPath:
         with raises(DijkstraNoPath):
             find_path({**self.edges_low, **self.edges_high}, 1, 10)
 
+    def test_unorderable_ties(self):
+        """Equally distant nodes of different types are never compared."""
+        edges = {'s': {1: {}, 'x': {}},
+                 1: {'s': {}, 't': {}},
+                 'x': {'s': {}, 't': {}},
+                 't': {1: {}, 'x': {}}}
+        length, path = find_path(edges, 's', 't')
+        assert length == 2
+        assert path in (['s', 1, 't'], ['s', 'x', 't'])
+
     @given(floats(-10e7, 10e7))
     def test_simple_weight(self, weight):
         """Weight is one constant function"""
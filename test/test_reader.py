@@ -211,3 +211,33 @@ def _reader_assertions(reader: TwReader):
     assert reader.num_edges == 36
     assert reader.edges == expected_edges
     assert reader.adjacency_dict == expected_adj
+
+
+def test_reader_neighbors():
+    """The neighbors are read from the csr adjacency in sorted order."""
+    content = "p tw 5 4\n3 1\n1 2\n2 3\n3 2\n"
+    reader = TwReader.from_string(content)
+    vertices, indptr, indices = reader.csr
+    assert sorted(vertices) == [1, 2, 3]
+    assert len(indices) == indptr[-1] == 6
+    assert reader.neighbors(3) == [1, 2]
+    assert reader.neighbors(1) == [2, 3]
+    assert reader.neighbors(5) == []
+    assert reader.adjacency_dict == {1: {2, 3}, 2: {1, 3}, 3: {1, 2}}
+
+
+def test_reader_crlf_lines():
+    """Windows line endings should be read like plain newlines."""
+    reader = TwReader.from_string("p tw 3 2\r\nc\r\n1 2\r\n2 3\r\n")
+    assert reader.edges == {(1, 2), (2, 3)}
+
+
+def test_reader_new_edges():
+    """The adjacency follows assigned edges and can be assigned itself."""
+    reader = TwReader.from_string("p tw 3 2\n1 2\n2 3\n")
+    assert reader.neighbors(2) == [1, 3]
+    reader.edges = {(1, 3)}
+    assert reader.neighbors(2) == []
+    assert reader.adjacency_dict == {1: {3}, 3: {1}}
+    reader.adjacency_dict = {1: {2}, 2: {1}}
+    assert reader.adjacency_dict == {1: {2}, 2: {1}}
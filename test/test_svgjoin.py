@@ -25,6 +25,7 @@ from collections.abc import Iterable as iter_type
 from os import makedirs
 from os.path import dirname, join
 from random import randint
+from shutil import copyfile
 from typing import Generator
 
 from benedict import benedict
@@ -35,7 +36,8 @@ from hypothesis.strategies import (
 
 from pytest import mark, param
 
-from tdvisu.svgjoin import append_svg, f_transform, gen_arg
+from tdvisu import svgjoin
+from tdvisu.svgjoin import append_svg, f_transform, gen_arg, read_svg, svg_join
 
 
 WRITE = False  # ??? Write Testimages instead of just reading them ???
@@ -72,6 +74,9 @@ def rand_smaller(number):
     return last_random
 
 
+TRAFO_KEYS = ('vertical_snd', 'combine_height', 'scale2')
+
+
 class TestNewHeight:
     """Test the transform method in svgjoin"""
 
@@ -115,13 +120,13 @@ class TestNewHeight:
     def test_parameters_default(self, arguments, expected):
         """Test that the default parameters from f_transform work as expected."""
         result = f_transform(**arguments)
-        assert result == expected
+        assert dict(zip(TRAFO_KEYS, result)) == expected
 
     @mark.parametrize("arguments,expected", parameters_moving)
     def test_parameters_moving(self, arguments, expected):
         """Test that different parameters for f_transform work as expected."""
         result = f_transform(**arguments)
-        assert result == expected
+        assert dict(zip(TRAFO_KEYS, result)) == expected
 
 
 @given(recursive(booleans() | floats() | none() | text() | integers(),
@@ -222,3 +227,66 @@ def test_append_svg_pinned(otherargs, filename, reverse, padding, write=WRITE):
                     result.to_xml(output=outfile, pretty=True)
             with open(join(DIR, filename), 'r') as expected:
                 assert result == benedict.from_xml(expected.read())
+
+
+@mark.parametrize(
+    "viewbox",
+    ["0 0 10 20", " 0,0, 10 ,20 ", "0.0\t0.0\n10.0, 20.0"]
+)
+def test_append_svg_viewbox_separators(viewbox):
+    """The viewBox numbers may be separated by whitespace and/or a comma."""
+    first = {'svg': {'@viewBox': viewbox, 'g': {}}}
+    second = {'svg': {'@viewBox': '0 0 10 20', 'g': {}}}
+    result = append_svg(first, second)
+    assert result['svg']['@viewBox'] == "0.0 0.0 20 20"
+
+
+def test_svg_join_parallel(tmp_path):
+    """Joining the timesteps in worker processes writes the same images."""
+    for step in (1, 2, 3):
+        copyfile(FILE1, tmp_path / f"first{step}.svg")
+        copyfile(FILE2, tmp_path / f"second{step}.svg")
+    kwargs = dict(num_images=3, padding=[0, 50], v_bottom=[None, 'center', 1.2])
+    svg_join(['first', 'second'], tmp_path, outname='serial', max_workers=1,
+             **kwargs)
+    svg_join(['first', 'second'], tmp_path, outname='parallel', max_workers=3,
+             **kwargs)
+    for step in (1, 2, 3):
+        serial = (tmp_path / f"serial{step}.svg").read_text()
+        assert serial == (tmp_path / f"parallel{step}.svg").read_text()
+    assert (tmp_path / "serial1.svg").read_text() != serial, \
+        "the arguments should change between the timesteps"
+
+
+def test_read_svg_cached(mocker, tmp_path):
+    """Repeated images are parsed once but returned as separate copies."""
+    parse = mocker.spy(svgjoin.xmltodict, 'parse')
+    for step in (1, 2, 3):
+        copyfile(FILE1, tmp_path / f"same{step}.svg")
+    cache = {}
+    first = read_svg(tmp_path / "same1.svg", cache)
+    first['svg']['@viewBox'] = "changed"
+    second = read_svg(tmp_path / "same2.svg", cache)
+    second['svg']['@viewBox'] = "changed"
+    third = read_svg(tmp_path / "same3.svg", cache)
+    assert third['svg']['@viewBox'] != "changed"
+    assert parse.call_count == 2
+    read_svg(tmp_path / "same1.svg")
+    assert parse.call_count == 3
+
+
+@mark.parametrize("max_workers, parallel", [(None, False), (1, False), (4, True)])
+def test_svg_join_default_workers(mocker, max_workers, parallel):
+    """Worker processes only get started when asked for."""
+    mocker.patch.object(svgjoin, 'join_step')
+    pool = mocker.patch.object(svgjoin, 'ProcessPoolExecutor')
+    svg_join(['first', 'second'], num_images=8, max_workers=max_workers)
+    assert pool.called == parallel
+    assert svgjoin.join_step.call_count == (0 if parallel else 8)
+
+
+def test_f_transform_keeps_scale2():
+    """The returned scale2 only depends on the arguments of the call."""
+    assert repr(f_transform(10, 10, scale2=True)[2]) == 'True'
+    assert repr(f_transform(10, 10, scale2=1.0)[2]) == '1.0'
+    assert repr(f_transform(10, 10, scale2=1)[2]) == '1'
@@ -27,8 +27,9 @@ from hypothesis.strategies import (integers, none, one_of)
 
 from pytest import mark, param, raises
 
-from tdvisu.utilities import (add_edge_to, bag_node, convert_to_adj, flatten,
-                              read_yml_or_cfg, solution_node)
+from tdvisu.utilities import (add_edge_to, bag_node, convert_to_adj,
+                              convert_to_csr, flatten, read_yml_or_cfg,
+                              solution_node, tree_parents, tree_path)
 
 
 @mark.parametrize(
@@ -64,6 +65,37 @@ def test_convert_to_adj():
         2: {1: {}, 3: {}, 4: {}}, 1: {2: {}}, 3: {2: {}}, 4: {2: {}, 5: {}}, 5: {4: {}}}
 
 
+def test_convert_to_csr():
+    """Test the convert_to_csr method"""
+    vertices, indptr, indices = convert_to_csr([(2, 1), (3, 2), (4, 2), (5, 4)])
+    assert vertices == [2, 1, 3, 4, 5]
+    assert list(indptr) == [0, 3, 4, 5, 7, 8]
+    assert list(indices) == [1, 2, 3, 0, 0, 0, 4, 3]
+
+
+def test_tree_parents():
+    """Test the tree_parents method"""
+    csr = convert_to_csr([(2, 1), (3, 2), (4, 2), (5, 4)])
+    assert tree_parents(csr, 5) == ({5: None, 4: 5, 2: 4, 1: 2, 3: 2},
+                                    {5: 0, 4: 1, 2: 2, 1: 3, 3: 3})
+    assert tree_parents(convert_to_csr([]), 1) == ({1: None}, {1: 0})
+
+
+@mark.parametrize(
+    "source, target, expected",
+    [(5, 5, [5]),
+     (5, 1, [5, 4, 2, 1]),
+     (1, 5, [1, 2, 4, 5]),
+     (1, 3, [1, 2, 3]),
+     (3, 4, [3, 2, 4])]
+)
+def test_tree_path(source, target, expected):
+    """Test the tree_path method on a tree rooted at 5."""
+    csr = convert_to_csr([(2, 1), (3, 2), (4, 2), (5, 4)])
+    parent, depth = tree_parents(csr, 5)
+    assert tree_path(parent, depth, source, target) == expected
+
+
 @mark.parametrize(
     "edges, adj, vertex1, vertex2, new_adj",
     [param(set(), {}, 1, 2, {1: {2}, 2: {1}},
@@ -215,6 +247,9 @@ def test_solution_node_filler(columns, lines, columnsmax, linesmax):
     result = solution_node(column_based_table, 'a', 'b', True, **optional_args)
     assert (result.count('|') == expect_line_dividers + 2
             ), "line-divider count should increase by two with labels."
+    assert result == solution_node(list(zip(*column_based_table)), 'a', 'b',
+                                   **optional_args
+                                   ), "should match transposing beforehand"
 
     # number of fillers:
     assert result.count(fill) == (bool(lines >= cmax + 1) * min(columns, lmax + 1) +